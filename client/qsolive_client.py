@@ -3,17 +3,22 @@
 QSOlive Client - Captures UDP ADIF and sends to Supabase
 """
 
+import asyncio
+import functools
 import os
+import re
 import socket
-import json
 import logging
 import sys
-import time
 from datetime import datetime, timezone
-from typing import Dict, Optional
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional
+import aiohttp
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-import maidenhead as mh
 
 # Built-in Supabase (hidden from user). Set via build_config.py at build time, or env for dev.
 try:
@@ -44,12 +49,12 @@ def load_config() -> Dict:
     """Load configuration from config.json. Supabase URL/key can be built-in (user never sees them)."""
     path = _config_path()
     try:
-        with open(path, 'r') as f:
-            data = json.load(f)
+        with open(path, 'rb') as f:
+            data = orjson.loads(f.read())
     except FileNotFoundError:
         print("ERROR: config.json not found! Please run the installer or copy config.example.json to config.json.")
         sys.exit(1)
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         print("ERROR: Invalid JSON in config.json")
         sys.exit(1)
     # Prefer built-in Supabase so user does not need to configure them
@@ -121,63 +126,160 @@ logging.basicConfig(
 )
 logger = logging.getLogger('QSOlive')
 
+# ADIF tag: <NAME:LENGTH> or <NAME:LENGTH:T> (single-letter type), or a bare
+# marker like <EOR>. Name and length come back from one C-level match.
+_ADIF_TAG = re.compile(rb'<([A-Za-z_][A-Za-z0-9_]*)(?::(\d+)(?::[A-Za-z])?)?>')
+
+# ADIF fields the client turns into a contact; everything else is skipped
+_ADIF_FIELDS = frozenset({
+    b'CALL', b'QSO_DATE', b'TIME_ON', b'BAND', b'MODE', b'FREQ',
+    b'RST_SENT', b'RST_RCVD', b'GRIDSQUARE', b'MY_GRIDSQUARE', b'STATION_CALLSIGN',
+})
+
 class ADIFParser:
     """Parse ADIF format QSO data"""
     
     @staticmethod
-    def parse(adif_string: str) -> Dict:
-        """Parse ADIF string into dictionary"""
+    def parse(buf: bytes) -> Dict:
+        """Parse raw ADIF bytes into a dictionary of the fields the client uses"""
         fields = {}
         
-        # Simple ADIF parser - handles <FIELD:LENGTH>VALUE format
-        i = 0
-        while i < len(adif_string):
-            if adif_string[i] == '<':
-                # Find field name and length
-                end = adif_string.find('>', i)
-                if end == -1:
+        # Handles <FIELD:LENGTH>VALUE format; the value is skipped over so any
+        # '<' inside it is never mistaken for a tag
+        search = _ADIF_TAG.search
+        pos = 0
+        while True:
+            m = search(buf, pos)
+            if m is None:
+                break
+            
+            field_name, field_length = m.groups()
+            field_name = field_name.upper()
+            value_start = m.end()
+            if field_length is None:
+                # Bare marker such as <EOH> or <EOR>
+                if field_name == b'EOR':
                     break
-                
-                field_info = adif_string[i+1:end]
-                parts = field_info.split(':')
-                
-                if len(parts) >= 2:
-                    field_name = parts[0].upper()
-                    try:
-                        field_length = int(parts[1])
-                    except ValueError:
-                        i = end + 1
-                        continue
-                    
-                    # Extract value
-                    value_start = end + 1
-                    value = adif_string[value_start:value_start + field_length]
-                    fields[field_name] = value.strip()
-                    
-                    i = value_start + field_length
-                else:
-                    i = end + 1
-            else:
-                i += 1
+                pos = value_start
+                continue
+            
+            # Unused fields are only skipped over, never sliced or decoded
+            pos = value_start + int(field_length)
+            if field_name in _ADIF_FIELDS:
+                fields[field_name.decode('ascii')] = buf[value_start:pos].strip().decode('ascii', errors='ignore')
         
         return fields
 
+@functools.lru_cache(maxsize=4096)
+def _grid_to_latlon(grid: str) -> Optional[tuple]:
+    """Cached grid square -> (lat, lon) of its south-west corner; expects an upper-cased grid
+    
+    Same arithmetic (and result) as maidenhead.to_location for 4, 6 and 8 character
+    locators, but invalid input is range-checked instead of raising.
+    """
+    n = len(grid)
+    if n not in (4, 6, 8):
+        return None
+    
+    # Field (A-R) and square (0-9)
+    a = ord(grid[0]) - 65
+    b = ord(grid[1]) - 65
+    c = ord(grid[2]) - 48
+    d = ord(grid[3]) - 48
+    if not (0 <= a < 18 and 0 <= b < 18 and 0 <= c < 10 and 0 <= d < 10):
+        logger.warning(f"Failed to geocode grid square {grid}: invalid locator")
+        return None
+    lon = -180.0 + a * 20 + c * 2
+    lat = -90.0 + b * 10 + d
+    
+    # Subsquare (A-X)
+    if n >= 6:
+        e = ord(grid[4]) - 65
+        f = ord(grid[5]) - 65
+        if not (0 <= e < 24 and 0 <= f < 24):
+            logger.warning(f"Failed to geocode grid square {grid}: invalid locator")
+            return None
+        lon += e * 5.0 / 60
+        lat += f * 2.5 / 60
+    
+    # Extended square (0-9)
+    if n >= 8:
+        g = ord(grid[6]) - 48
+        h = ord(grid[7]) - 48
+        if not (0 <= g < 10 and 0 <= h < 10):
+            logger.warning(f"Failed to geocode grid square {grid}: invalid locator")
+            return None
+        lon += g * 5.0 / 600
+        lat += h * 2.5 / 600
+    
+    return (lat, lon)
+
 class GridSquareGeocoder:
     """Convert Maidenhead grid squares to lat/lon"""
     
     @staticmethod
     def to_latlon(grid: str) -> Optional[tuple]:
         """Convert grid square to (lat, lon) tuple"""
-        try:
-            if not grid or len(grid) < 4:
-                return None
-            
-            # Use maidenhead library
-            lat, lon = mh.to_location(grid)
-            return (lat, lon)
-        except Exception as e:
-            logger.warning(f"Failed to geocode grid square {grid}: {e}")
+        # Same grids recur constantly (own MY_GRIDSQUARE, popular DX), so results are cached
+        if not grid:
             return None
+        return _grid_to_latlon(grid.strip().upper())
+
+def _set_field(column: str):
+    """Handler that copies an ADIF value into a contact column unchanged"""
+    def handler(contact: Dict, value: str):
+        contact[column] = value
+    return handler
+
+def _set_freq(contact: Dict, value: str):
+    try:
+        contact['frequency'] = float(value)
+    except ValueError:
+        pass
+
+def _set_grid(column: str, location_column: str):
+    """Handler that stores a grid square and its geocoded location"""
+    lon_column = f'{location_column}_lon'
+    lat_column = f'{location_column}_lat'
+    def handler(contact: Dict, value: str):
+        contact[column] = value
+        latlon = GridSquareGeocoder.to_latlon(value)
+        if latlon:
+            # The set_contact_locations trigger builds the PostGIS point from these
+            contact[lat_column], contact[lon_column] = latlon
+    return handler
+
+# ADIF field -> handler(contact, value) for the optional parts of a contact
+_FIELD_HANDLERS = {
+    'BAND': _set_field('band'),
+    'MODE': _set_field('mode'),
+    'FREQ': _set_freq,
+    'RST_SENT': _set_field('rst_sent'),
+    'RST_RCVD': _set_field('rst_rcvd'),
+    'GRIDSQUARE': _set_grid('gridsquare', 'location'),
+    'MY_GRIDSQUARE': _set_grid('my_gridsquare', 'my_location'),
+}
+
+@functools.lru_cache(maxsize=4)
+def get_headers(key: str) -> Mapping[str, str]:
+    """Read-only PostgREST headers for a Supabase key, built once per key"""
+    return MappingProxyType({
+        'apikey': key,
+        'Authorization': f'Bearer {key}',
+        'Content-Type': 'application/json',
+        'Prefer': 'return=minimal'
+    })
+
+def _bulk_columns(contacts: List[Dict]) -> str:
+    """Union of keys for PostgREST's columns parameter.
+    
+    PostgREST requires every object in a bulk insert to share the same keys;
+    naming the columns lets optional fields be missing (NULL) per record.
+    """
+    columns = {}
+    for contact in contacts:
+        columns.update(dict.fromkeys(contact))
+    return ','.join(columns)
 
 class SupabaseClient:
     """Client for sending data to Supabase"""
@@ -185,22 +287,20 @@ class SupabaseClient:
     def __init__(self, url: str, key: str):
         self.url = url.rstrip('/')
         self.key = key
-        self.headers = {
-            'apikey': key,
-            'Authorization': f'Bearer {key}',
-            'Content-Type': 'application/json',
-            'Prefer': 'return=minimal'
-        }
+        self.headers = get_headers(key)
+        # Keep the TCP/TLS connection to Supabase alive across inserts
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=Retry(total=0)))
+        self.session.headers.update(self.headers)
     
     def insert_contact(self, contact: Dict) -> bool:
         """Insert a contact into Supabase"""
         endpoint = f"{self.url}/rest/v1/contacts"
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 endpoint,
-                headers=self.headers,
-                json=contact,
+                data=orjson.dumps(contact),
                 timeout=10
             )
             
@@ -215,36 +315,112 @@ class SupabaseClient:
             logger.error(f"Network error: {e}")
             return False
 
+class AsyncSupabaseClient:
+    """asyncio client for sending data to Supabase, used by the live client"""
+    
+    def __init__(self, url: str, key: str):
+        self.url = url.rstrip('/')
+        self.key = key
+        self.headers = get_headers(key)
+        self.session: Optional[aiohttp.ClientSession] = None
+    
+    async def open(self):
+        """Create the pooled keep-alive session; must run inside the event loop"""
+        self.session = aiohttp.ClientSession(
+            headers=self.headers,
+            connector=aiohttp.TCPConnector(limit=16, keepalive_timeout=120),
+            timeout=aiohttp.ClientTimeout(total=10)
+        )
+    
+    async def close(self):
+        if self.session:
+            await self.session.close()
+    
+    async def insert_contacts(self, contacts: List[Dict]) -> int:
+        """Insert a batch of contacts into Supabase with a single bulk POST
+        
+        Returns the HTTP status, or 0 on a network error.
+        """
+        endpoint = f"{self.url}/rest/v1/contacts"
+        
+        try:
+            async with self.session.post(
+                endpoint,
+                params={'columns': _bulk_columns(contacts)},
+                data=orjson.dumps(contacts)
+            ) as response:
+                if response.status in [200, 201]:
+                    for contact in contacts:
+                        logger.info(f"[OK] Logged contact: {contact.get('contacted_callsign')} on {contact.get('band')} {contact.get('mode')}")
+                else:
+                    logger.error(f"Failed to insert {len(contacts)} contacts: {response.status} - {await response.text(errors='replace')}")
+                return response.status
+                
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Network error: {e}")
+            return 0
+
+async def _drain(outbox: asyncio.Queue, max_items: int) -> List[Dict]:
+    """Wait for one item, then take whatever else is queued (up to max_items)"""
+    batch = [await outbox.get()]
+    while len(batch) < max_items:
+        try:
+            batch.append(outbox.get_nowait())
+        except asyncio.QueueEmpty:
+            break
+    return batch
+
+# 4xx responses that are transient and worth retrying unchanged
+_RETRYABLE_4XX = frozenset({408, 429})
+# 4xx responses that blame the rows (CHECK/type errors, unique/FK conflicts, size)
+_REJECTED_ROWS_4XX = frozenset({400, 409, 413, 422})
+
+# UDP receive: bytes per recvfrom and datagrams read per readiness callback
+_RECV_BUFSIZE = 8192
+_RECV_DRAIN_MAX = 64
+
+class _UDPProtocol(asyncio.DatagramProtocol):
+    """Hands every received datagram to the client"""
+    
+    def __init__(self, client: 'QSOliveClient'):
+        self.client = client
+    
+    def datagram_received(self, data: bytes, addr):
+        self.client.handle_datagram(data, addr)
+    
+    def error_received(self, exc: Exception):
+        logger.error(f"UDP receive error: {exc}")
+
 class QSOliveClient:
     """Main client application"""
     
     def __init__(self, config: Dict):
         self.config = config
-        self.supabase = SupabaseClient(
-            config['supabase_url'],
-            config['supabase_key']
-        )
         self.parser = ADIFParser()
-        self.geocoder = GridSquareGeocoder()
         self.sock = None
+        # Parsed contacts waiting for a sender task; created in run_async (needs the loop)
+        self.outbox: Optional[asyncio.Queue] = None
+        self.dropped = 0
         
     def setup_udp_listener(self):
         """Setup UDP socket listener"""
         try:
             self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            # Room for bursts (contest logging, WSJT-X floods) while we are busy sending
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 8 * 1024 * 1024)
             self.sock.bind((
                 self.config.get('udp_host', '0.0.0.0'),
                 self.config.get('udp_port', 2237)
             ))
-            self.sock.settimeout(1.0)  # Set timeout to allow loop to check for interrupts
+            self.sock.setblocking(False)
             logger.info(f"UDP listener started on {self.config.get('udp_host')}:{self.config.get('udp_port')}")
         except OSError as e:
             logger.error(f"Failed to bind UDP socket: {e}")
             logger.error("Is another instance running? Is the port already in use?")
             sys.exit(1)
     
-    def process_adif(self, adif_data: str) -> Optional[Dict]:
+    def process_adif(self, adif_data: bytes) -> Optional[Dict]:
         """Process ADIF data into contact record"""
         try:
             # Parse ADIF
@@ -278,38 +454,15 @@ class QSOliveClient:
             elif len(contact['time_on']) == 4:
                 contact['time_on'] = f"{contact['time_on'][:2]}:{contact['time_on'][2:4]}:00"
             
-            # Optional fields
-            if 'BAND' in fields:
-                contact['band'] = fields['BAND']
-            if 'MODE' in fields:
-                contact['mode'] = fields['MODE']
-            if 'FREQ' in fields:
-                try:
-                    contact['frequency'] = float(fields['FREQ'])
-                except ValueError:
-                    pass
-            if 'RST_SENT' in fields:
-                contact['rst_sent'] = fields['RST_SENT']
-            if 'RST_RCVD' in fields:
-                contact['rst_rcvd'] = fields['RST_RCVD']
-            
-            # Geocode grid square
-            if 'GRIDSQUARE' in fields:
-                contact['gridsquare'] = fields['GRIDSQUARE']
-                latlon = self.geocoder.to_latlon(fields['GRIDSQUARE'])
-                if latlon:
-                    # PostGIS POINT format: POINT(lon lat)
-                    contact['location'] = f"POINT({latlon[1]} {latlon[0]})"
-            
-            # Operator grid square
-            if 'MY_GRIDSQUARE' in fields:
-                contact['my_gridsquare'] = fields['MY_GRIDSQUARE']
-                latlon = self.geocoder.to_latlon(fields['MY_GRIDSQUARE'])
-                if latlon:
-                    contact['my_location'] = f"POINT({latlon[1]} {latlon[0]})"
+            # Optional fields: one table lookup per parsed field
+            for name, value in fields.items():
+                handler = _FIELD_HANDLERS.get(name)
+                if handler:
+                    handler(contact, value)
             
             # Store raw ADIF for debugging
-            contact['raw_adif'] = adif_data
+            if logger.isEnabledFor(logging.DEBUG):
+                contact['raw_adif'] = adif_data.decode('latin1')
             
             return contact
             
@@ -317,6 +470,126 @@ class QSOliveClient:
             logger.error(f"Error processing ADIF: {e}", exc_info=True)
             return None
     
+    def _drain_socket(self):
+        """Read the datagrams already queued on the socket, then return to the loop"""
+        # Capped so a sustained flood cannot starve the sender tasks; the loop
+        # calls back straight away while the socket is still readable
+        for _ in range(_RECV_DRAIN_MAX):
+            try:
+                data, addr = self.sock.recvfrom(_RECV_BUFSIZE)
+            except BlockingIOError:
+                return
+            except OSError as e:
+                logger.error(f"UDP receive error: {e}")
+                return
+            self.handle_datagram(data, addr)
+    
+    def handle_datagram(self, data: bytes, addr):
+        """Parse one UDP packet and queue the contact for the senders"""
+        logger.debug(f"Received {len(data)} bytes from {addr}")
+        logger.debug("ADIF: %r...", data[:100])
+        
+        # Process ADIF
+        contact = self.process_adif(data)
+        
+        if contact:
+            # Hand off to the sender tasks
+            try:
+                self.outbox.put_nowait(contact)
+            except asyncio.QueueFull:
+                self.dropped += 1
+                logger.warning(f"Outbox full, dropped contact {contact['contacted_callsign']} ({self.dropped} dropped so far)")
+    
+    async def _sender_loop(self, supabase: AsyncSupabaseClient):
+        """Send batches from the outbox until cancelled"""
+        batch_size = self.config.get('batch_size', 25)
+        while True:
+            batch = await _drain(self.outbox, batch_size)
+            try:
+                await self._send_batch(supabase, batch)
+            except Exception as e:
+                # Keep the sender alive; a dead task would silently stop all sending
+                logger.error(f"Error sending {len(batch)} contacts: {e}", exc_info=True)
+            finally:
+                for _ in batch:
+                    self.outbox.task_done()
+    
+    async def _send_batch(self, supabase: AsyncSupabaseClient, batch: List[Dict]):
+        """Send one batch of contacts to Supabase with retry"""
+        attempts = self.config.get('retry_attempts', 3)
+        for attempt in range(attempts):
+            status = await supabase.insert_contacts(batch)
+            if status in [200, 201]:
+                return
+            if status in _REJECTED_ROWS_4XX:
+                # The bulk insert is one statement, so one bad row (e.g. a CHECK
+                # violation) rejects them all; resending unchanged cannot help
+                await self._split_rejected(supabase, batch)
+                return
+            if 400 <= status < 500 and status not in _RETRYABLE_4XX:
+                # Request refused (bad key, RLS, wrong URL); insert_contacts logged it
+                return
+            if attempt < attempts - 1:
+                delay = self.config.get('retry_delay', 5)
+                logger.warning(f"Retry in {delay} seconds...")
+                await asyncio.sleep(delay)
+        
+        logger.error(f"Failed to log {len(batch)} contacts after {attempts} attempts")
+    
+    async def _split_rejected(self, supabase: AsyncSupabaseClient, batch: List[Dict]):
+        """Resend a rejected batch in halves until only the offending contacts are dropped"""
+        if len(batch) == 1:
+            contact = batch[0]
+            logger.error(f"Dropped contact rejected by Supabase: {contact.get('contacted_callsign')} "
+                         f"{contact.get('qso_date')} {contact.get('time_on')} "
+                         f"({contact.get('band')} {contact.get('mode')} {contact.get('frequency')})")
+            return
+        half = len(batch) // 2
+        await self._send_batch(supabase, batch[:half])
+        await self._send_batch(supabase, batch[half:])
+    
+    async def run_async(self):
+        """Receive UDP and send to Supabase concurrently on one event loop"""
+        loop = asyncio.get_running_loop()
+        self.outbox = asyncio.Queue(maxsize=self.config.get('outbox_max', 1000))
+        
+        self.setup_udp_listener()
+        transport = None
+        try:
+            # Selector loops (Linux, macOS): drain every queued packet per wakeup
+            loop.add_reader(self.sock, self._drain_socket)
+        except NotImplementedError:
+            # Proactor loop (Windows default) has no add_reader; read per datagram
+            transport, _ = await loop.create_datagram_endpoint(lambda: _UDPProtocol(self), sock=self.sock)
+        
+        supabase = AsyncSupabaseClient(self.config['supabase_url'], self.config['supabase_key'])
+        await supabase.open()
+        senders = [
+            asyncio.create_task(self._sender_loop(supabase))
+            for _ in range(self.config.get('sender_tasks', 4))
+        ]
+        
+        logger.info("Waiting for UDP ADIF packets...")
+        logger.info("Press Ctrl+C to stop")
+        
+        try:
+            await asyncio.Event().wait()
+        finally:
+            if transport:
+                transport.close()
+            else:
+                loop.remove_reader(self.sock)
+                self.sock.close()
+            # Give the senders a chance to send what is still queued
+            try:
+                await asyncio.wait_for(self.outbox.join(), timeout=10)
+            except asyncio.TimeoutError:
+                logger.warning(f"{self.outbox.qsize()} contacts were not sent before shutdown")
+            for task in senders:
+                task.cancel()
+            await asyncio.gather(*senders, return_exceptions=True)
+            await supabase.close()
+    
     def run(self):
         """Main run loop"""
         env_label, branch = _get_env_display()
@@ -329,53 +602,11 @@ class QSOliveClient:
         logger.info("=" * 60)
         print(f"QSOlive [%s] branch=%s db=%s" % (env_label, branch, db_display))
         
-        self.setup_udp_listener()
-        
-        logger.info("Waiting for UDP ADIF packets...")
-        logger.info("Press Ctrl+C to stop")
-        
         try:
-            while True:
-                try:
-                    # Receive UDP packet
-                    data, addr = self.sock.recvfrom(4096)
-                    adif_string = data.decode('utf-8', errors='ignore')
-                    
-                    logger.debug(f"Received {len(data)} bytes from {addr}")
-                    logger.debug(f"ADIF: {adif_string[:100]}...")
-                    
-                    # Process ADIF
-                    contact = self.process_adif(adif_string)
-                    
-                    if contact:
-                        # Send to Supabase with retry
-                        success = False
-                        for attempt in range(self.config.get('retry_attempts', 3)):
-                            if self.supabase.insert_contact(contact):
-                                success = True
-                                break
-                            else:
-                                if attempt < self.config.get('retry_attempts', 3) - 1:
-                                    delay = self.config.get('retry_delay', 5)
-                                    logger.warning(f"Retry in {delay} seconds...")
-                                    time.sleep(delay)
-                        
-                        if not success:
-                            logger.error(f"Failed to log contact after {self.config.get('retry_attempts', 3)} attempts")
-                    
-                except socket.timeout:
-                    continue
-                except KeyboardInterrupt:
-                    raise
-                except Exception as e:
-                    logger.error(f"Error in main loop: {e}", exc_info=True)
-                    time.sleep(1)
-                    
+            asyncio.run(self.run_async())
         except KeyboardInterrupt:
             logger.info("Shutting down...")
         finally:
-            if self.sock:
-                self.sock.close()
             logger.info("QSOlive client stopped")
 
 def main():
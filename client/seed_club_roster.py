@@ -4,7 +4,8 @@ Seed club_roster: assign operator callsigns (from contacts) to clubs at random.
 
 - Fetches clubs from Supabase (uses first 5 by name, or pass --club-ids).
 - Fetches distinct operator_callsign from the contacts table.
-- Inserts each callsign into club_roster with a randomly chosen club.
+- Inserts each callsign into club_roster with a randomly chosen club, in
+  batches of BATCH_SIZE rows per request (existing entries are skipped).
 
 Requires a key that can INSERT into club_roster (RLS: owner or master_admin).
 Use supabase_service_key in config.json to bypass RLS, or run as a one-off in
@@ -24,7 +25,10 @@ import os
 import requests
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from qsolive_client import load_config
+from qsolive_client import get_headers
+
+# club_roster rows sent per POST
+BATCH_SIZE = 500
 
 
 def load_config_file(path):
@@ -32,27 +36,23 @@ def load_config_file(path):
         return json.load(f)
 
 
-def get_headers(key):
-    return {
-        "apikey": key,
-        "Authorization": f"Bearer {key}",
-        "Content-Type": "application/json",
-        "Prefer": "return=minimal",
-    }
+def make_session(key):
+    """Create a Session that reuses one connection to Supabase for every request."""
+    session = requests.Session()
+    session.headers.update(get_headers(key))
+    return session
 
 
-def fetch_clubs(url, key, limit=5, club_ids=None):
+def fetch_clubs(session, url, limit=5, club_ids=None):
     """Fetch clubs. If club_ids given, fetch those; else fetch all and take first `limit` by name."""
-    headers = get_headers(key)
     if club_ids:
         ids = [x.strip() for x in club_ids.split(",") if x.strip()][:limit]
         if not ids:
             return []
         # PostgREST: id=in.(uuid1,uuid2,...)
         in_filter = "in.(" + ",".join(ids) + ")"
-        r = requests.get(
+        r = session.get(
             f"{url}/rest/v1/clubs?select=id,name&id={in_filter}",
-            headers=headers,
             timeout=15,
         )
         r.raise_for_status()
@@ -61,9 +61,8 @@ def fetch_clubs(url, key, limit=5, club_ids=None):
         by_id = {str(c["id"]): c for c in data}
         data = [by_id[i] for i in ids if i in by_id]
     else:
-        r = requests.get(
+        r = session.get(
             f"{url}/rest/v1/clubs?select=id,name&order=name&limit={limit}",
-            headers=headers,
             timeout=15,
         )
         r.raise_for_status()
@@ -71,17 +70,19 @@ def fetch_clubs(url, key, limit=5, club_ids=None):
     return data
 
 
-def fetch_operator_callsigns(url, key):
-    """Fetch distinct operator_callsign from contacts (paginate if needed)."""
-    headers = get_headers(key)
-    headers["Accept"] = "application/json"
+def fetch_operator_callsigns(session, url):
+    """Fetch distinct operator_callsign from contacts.
+
+    Pages by keyset (id > last seen id) so each page is an index range scan
+    instead of re-reading and discarding `offset` rows.
+    """
     seen = set()
-    offset = 0
+    last_id = 0
     page_size = 500
     while True:
-        r = requests.get(
-            f"{url}/rest/v1/contacts?select=operator_callsign&order=id&offset={offset}&limit={page_size}",
-            headers=headers,
+        r = session.get(
+            f"{url}/rest/v1/contacts?select=id,operator_callsign&order=id.asc&id=gt.{last_id}&limit={page_size}",
+            headers={"Accept": "application/json"},
             timeout=15,
         )
         r.raise_for_status()
@@ -94,30 +95,33 @@ def fetch_operator_callsigns(url, key):
                 seen.add(call.upper())
         if len(rows) < page_size:
             break
-        offset += page_size
+        last_id = rows[-1]["id"]
     return sorted(seen)
 
 
-def insert_roster_entry(url, key, club_id, callsign, dry_run=False):
-    """Insert one (club_id, callsign) into club_roster. Uses upsert to avoid duplicate errors."""
+def insert_roster_batch(session, url, entries, dry_run=False):
+    """Insert a chunk of {club_id, callsign} rows into club_roster in one request.
+
+    Rows already in the roster are skipped via ON CONFLICT DO NOTHING. Returns
+    the number of rows inserted, or None if the request failed.
+    """
     if dry_run:
-        print(f"  [DRY-RUN] would add {callsign} -> club {club_id}")
-        return True
-    headers = get_headers(key)
-    payload = {"club_id": club_id, "callsign": callsign}
-    r = requests.post(
+        for e in entries:
+            print(f"  [DRY-RUN] would add {e['callsign']} -> club {e['club_id']}")
+        return len(entries)
+    r = session.post(
         f"{url}/rest/v1/club_roster",
-        headers=headers,
-        json=payload,
-        timeout=10,
+        params={"on_conflict": "club_id,callsign"},
+        headers={"Prefer": "return=minimal,resolution=ignore-duplicates,count=exact"},
+        json=entries,
+        timeout=30,
     )
-    if r.status_code in (200, 201):
-        return True
-    if r.status_code == 409 or "23505" in (r.text or ""):
-        # Unique violation - already in roster
-        return True
-    print(f"  FAILED {callsign} -> {club_id}: {r.status_code} {r.text[:200]}")
-    return False
+    if r.status_code not in (200, 201):
+        print(f"  FAILED batch of {len(entries)}: {r.status_code} {r.text[:200]}")
+        return None
+    # Content-Range: */<rows inserted>
+    total = r.headers.get("Content-Range", "").rpartition("/")[2]
+    return int(total) if total.isdigit() else len(entries)
 
 
 def main():
@@ -142,33 +146,45 @@ def main():
     if not config.get("supabase_service_key") and not args.dry_run:
         print("WARNING: Using anon key; club_roster inserts may fail (RLS). Use supabase_service_key for seeding.")
 
+    session = make_session(key)
+
     print("Fetching clubs...")
-    clubs = fetch_clubs(url, key, limit=args.limit, club_ids=args.club_ids)
+    clubs = fetch_clubs(session, url, limit=args.limit, club_ids=args.club_ids)
     if not clubs:
         print("No clubs found. Create clubs in the app (Club Admin) first.")
         sys.exit(1)
     print(f"Using {len(clubs)} club(s): {[c['name'] for c in clubs]}")
 
     print("Fetching operator callsigns from contacts...")
-    callsigns = fetch_operator_callsigns(url, key)
+    callsigns = fetch_operator_callsigns(session, url)
     if not callsigns:
         print("No operator_callsign values in contacts. Run test_client.py first to create contacts.")
         sys.exit(1)
     print(f"Found {len(callsigns)} unique operator callsign(s)")
 
     club_ids = [c["id"] for c in clubs]
+    payload = [{"club_id": random.choice(club_ids), "callsign": call} for call in callsigns]
     added = 0
-    for call in callsigns:
-        club_id = random.choice(club_ids)
-        if insert_roster_entry(url, key, club_id, call, dry_run=args.dry_run):
-            added += 1
+    failed_batches = 0
+    failed_rows = 0
+    for start in range(0, len(payload), BATCH_SIZE):
+        batch = payload[start:start + BATCH_SIZE]
+        inserted = insert_roster_batch(session, url, batch, dry_run=args.dry_run)
+        if inserted is None:
+            failed_batches += 1
+            failed_rows += len(batch)
+        else:
+            added += inserted
 
     print("-" * 50)
     if args.dry_run:
         print(f"DRY-RUN: would assign {len(callsigns)} callsigns to {len(clubs)} clubs")
+    elif failed_batches:
+        print(f"Assigned {len(callsigns) - failed_rows} callsigns to clubs at random ({added} new roster entries).")
+        print(f"ERROR: {failed_batches} batch(es) failed; {failed_rows} callsigns in failed batches were not assigned.")
+        sys.exit(1)
     else:
-        print(f"Done. Assigned {added} callsigns to clubs at random.")
-
+        print(f"Done. Assigned {len(callsigns)} callsigns to clubs at random ({added} new roster entries).")
 
 if __name__ == "__main__":
     main()
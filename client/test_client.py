@@ -5,6 +5,7 @@ Simulates traffic by replaying an ADIF log file with current timestamps.
 """
 
 import argparse
+import io
 import re
 import time
 import random
@@ -12,18 +13,40 @@ import sys
 import os
 from datetime import datetime, timezone, timedelta
 
+# Status lines are written to stdout in blocks of this many records
+STATUS_FLUSH_EVERY = 50
+
+# Record separator, compiled once and reused for every file
+_EOR = re.compile(rb'<eor>', re.IGNORECASE)
+
+# Single tags swept over the whole file, so the pools need no per-record parse
+_CALL_TAG = re.compile(rb'<CALL:(\d+)(?::[A-Z])?>', re.IGNORECASE)
+_GRID_TAG = re.compile(rb'<GRIDSQUARE:(\d+)(?::[A-Z])?>', re.IGNORECASE)
+
+
+def _tag_values(pattern, content):
+    """Return every non-empty value of one ADIF tag in content, upper-cased"""
+    values = []
+    for m in pattern.finditer(content):
+        start = m.end()
+        value = content[start:start + int(m.group(1))].strip()
+        if value:
+            values.append(value.decode('ascii', errors='ignore').upper())
+    return values
+
 # Ensure the script directory is in the Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # Import classes from the main client to ensure consistent behavior
 try:
     # Check dependencies explicitly to provide helpful installation commands
-    try:
-        import maidenhead
-    except ImportError:
-        print("Error: The 'maidenhead' library is missing.")
-        print(f"Fix it by running: \"{sys.executable}\" -m pip install maidenhead")
-        sys.exit(1)
+    for _module in ('orjson', 'aiohttp'):
+        try:
+            __import__(_module)
+        except ImportError:
+            print(f"Error: The '{_module}' library is missing.")
+            print(f"Fix it by running: \"{sys.executable}\" -m pip install {_module}")
+            sys.exit(1)
 
     from qsolive_client import ADIFParser, GridSquareGeocoder, SupabaseClient, load_config
 except ImportError as e:
@@ -43,29 +66,30 @@ def run_simulation(args):
 
     # 3. Read ADIF File
     try:
-        with open(args.file, 'r', encoding='utf-8', errors='replace') as f:
+        with open(args.file, 'rb') as f:
             content = f.read()
     except FileNotFoundError:
         print(f"Error: File {args.file} not found.")
         sys.exit(1)
 
-    # Split by <EOR> (case insensitive) to get individual records
-    raw_records = re.split(r'<eor>', content, flags=re.IGNORECASE)
-    # Remove empty strings resulting from split
-    raw_records = [r for r in raw_records if r.strip()]
+    # Split by <EOR> (case insensitive) to get individual records. The compiled
+    # regex split measured faster than bytes.replace()+split() on the Log4OM sample.
+    raw_records = _EOR.split(content)
+    # Remove empty/whitespace-only chunks (isspace() avoids a strip() copy per record)
+    raw_records = [r for r in raw_records if r and not r.isspace()]
     
     print(f"Found {len(raw_records)} raw records in {args.file}")
     
-    # Pre-parse to find valid callsigns for the pool
-    parsed_records = []
-    all_callsigns = set()
-    for r in raw_records:
-        f = parser.parse(r)
-        if f and 'CALL' in f:
-            parsed_records.append(f)
-            all_callsigns.add(f['CALL'])
+    # One C-level sweep over the file for the callsign pool and grids;
+    # records themselves are only parsed as the send loop reaches them
+    calls = _tag_values(_CALL_TAG, content)
+    all_callsigns = set(calls)
+
+    # Warm the geocoder cache so the send loop never computes a grid
+    for grid in set(_tag_values(_GRID_TAG, content)):
+        geocoder.to_latlon(grid)
 
-    if not parsed_records:
+    if not all_callsigns:
         print("No valid ADIF records found.")
         sys.exit(1)
 
@@ -80,7 +104,7 @@ def run_simulation(args):
         operator_callsign_fixed = None
         print(f"Simulating {pool_size} concurrent operators: {', '.join(client_pool[:5])}...")
 
-    total_planned = min(args.limit, len(parsed_records))
+    total_planned = min(args.limit, len(calls))
     print(f"Sending max {args.limit} records with Poisson distribution (mean {args.delay}s)...")
     if args.hours_back > 0:
         print(f"Timestamps spread over last {args.hours_back} hours")
@@ -94,27 +118,47 @@ def run_simulation(args):
 
     # 4. Simulation Loop
     count = 0
+    status_buf = io.StringIO()
+
+    def flush_status():
+        sys.stdout.write(status_buf.getvalue())
+        sys.stdout.flush()
+        status_buf.seek(0)
+        status_buf.truncate()
+
+    # Hoisted out of the loop: one wall-clock read, then monotonic offsets
+    operators = client_pool or [operator_callsign_fixed]
+    pool_len = len(operators)
+    base = datetime.now(timezone.utc) - timedelta(hours=args.offset)
+    start_mono = time.monotonic()
+    if args.hours_back > 0 and total_planned > 1:
+        spread = timedelta(hours=args.hours_back)
+        step = spread / (total_planned - 1)
+    else:
+        spread = step = None
 
-    for i, fields in enumerate(parsed_records):
+    for r in raw_records:
         if count >= args.limit:
-            print("Limit reached.")
+            status_buf.write("Limit reached.\n")
             break
 
+        fields = parser.parse(r)
+        if 'CALL' not in fields:
+            continue
+
         # --- Operator ---
-        if operator_callsign_fixed:
-            operator_callsign = operator_callsign_fixed
-        else:
-            operator_callsign = client_pool[i % len(client_pool)]
+        operator_callsign = operators[count % pool_len]
 
         # --- Time Adjustment ---
-        anchor = datetime.now(timezone.utc) - timedelta(hours=args.offset)
-        if args.hours_back > 0 and total_planned > 1:
-            frac = count / (total_planned - 1)
-            qso_dt = anchor - timedelta(hours=args.hours_back) + timedelta(hours=args.hours_back * frac)
+        anchor = base + timedelta(seconds=time.monotonic() - start_mono)
+        if step is not None:
+            qso_dt = anchor - spread + step * count
         else:
             qso_dt = anchor
-        qso_date = qso_dt.strftime('%Y-%m-%d')
-        time_on = qso_dt.strftime('%H:%M:%S')
+        # isoformat() is 'YYYY-MM-DDTHH:MM:SS...'; cheaper than two strftime calls
+        stamp = qso_dt.isoformat()
+        qso_date = stamp[:10]
+        time_on = stamp[11:19]
 
         # Build Contact Object (Mirroring logic from qsolive_client.py)
         contact = {
@@ -142,21 +186,21 @@ def run_simulation(args):
             contact['gridsquare'] = fields['GRIDSQUARE']
             latlon = geocoder.to_latlon(fields['GRIDSQUARE'])
             if latlon:
-                contact['location'] = f"POINT({latlon[1]} {latlon[0]})"
+                contact['location_lat'], contact['location_lon'] = latlon
                 loc_status = f"Grid {fields['GRIDSQUARE']} OK"
             else:
                 loc_status = f"Grid {fields['GRIDSQUARE']} FAIL"
 
         # 5. Send to Supabase
-        print(f"[{count+1}] Sending {contact['contacted_callsign']} ({loc_status})...", end=" ", flush=True)
         success = supabase.insert_contact(contact)
-        
-        if success:
-            print("OK")
-        else:
-            print("FAILED")
+        status_buf.write(f"[{count+1}] Sending {contact['contacted_callsign']} ({loc_status})... {'OK' if success else 'FAILED'}\n")
 
         count += 1
+
+        # Write status in blocks when sending back-to-back; immediately on
+        # failure or when paced, since a write per record is then negligible
+        if count % STATUS_FLUSH_EVERY == 0 or not success or args.delay > 0:
+            flush_status()
         
         # 6. Delay (Poisson Distribution)
         if args.delay > 0:
@@ -164,6 +208,8 @@ def run_simulation(args):
             sleep_time = random.expovariate(1.0 / args.delay)
             time.sleep(sleep_time)
 
+    flush_status()
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="QSOlive Test Client")
     parser.add_argument('--file', type=str, default='Log4OM_ADIF_20260212223913.adi', help='Path to ADIF file')
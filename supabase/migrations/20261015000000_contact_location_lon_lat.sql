@@ -0,0 +1,43 @@
+-- Let clients send grid-square coordinates as plain numbers instead of
+-- 'POINT(lon lat)' WKT strings; the geography is built in the database with
+-- ST_MakePoint, so inserts no longer go through the WKT parser.
+--
+-- A BEFORE INSERT trigger is used rather than generated columns so that
+-- callers which still send location/my_location directly (the web ADIF
+-- upload) keep working.
+
+ALTER TABLE "public"."contacts"
+    ADD COLUMN IF NOT EXISTS "location_lon" double precision,
+    ADD COLUMN IF NOT EXISTS "location_lat" double precision,
+    ADD COLUMN IF NOT EXISTS "my_location_lon" double precision,
+    ADD COLUMN IF NOT EXISTS "my_location_lat" double precision;
+
+
+COMMENT ON COLUMN "public"."contacts"."location_lon" IS 'Longitude of contacted station; fills location on insert';
+
+COMMENT ON COLUMN "public"."contacts"."location_lat" IS 'Latitude of contacted station; fills location on insert';
+
+COMMENT ON COLUMN "public"."contacts"."my_location_lon" IS 'Longitude of operator; fills my_location on insert';
+
+COMMENT ON COLUMN "public"."contacts"."my_location_lat" IS 'Latitude of operator; fills my_location on insert';
+
+
+CREATE OR REPLACE FUNCTION "public"."set_contact_locations"() RETURNS "trigger"
+    LANGUAGE "plpgsql"
+    AS $$
+BEGIN
+  IF NEW.location IS NULL AND NEW.location_lon IS NOT NULL AND NEW.location_lat IS NOT NULL THEN
+    NEW.location := ST_SetSRID(ST_MakePoint(NEW.location_lon, NEW.location_lat), 4326)::geography;
+  END IF;
+  IF NEW.my_location IS NULL AND NEW.my_location_lon IS NOT NULL AND NEW.my_location_lat IS NOT NULL THEN
+    NEW.my_location := ST_SetSRID(ST_MakePoint(NEW.my_location_lon, NEW.my_location_lat), 4326)::geography;
+  END IF;
+  RETURN NEW;
+END;
+$$;
+
+
+ALTER FUNCTION "public"."set_contact_locations"() OWNER TO "postgres";
+
+
+CREATE OR REPLACE TRIGGER "set_contact_locations" BEFORE INSERT ON "public"."contacts" FOR EACH ROW EXECUTE FUNCTION "public"."set_contact_locations"();